@@ -1,4 +1,5 @@
 import os
+import functools
 import re
 import time
 import random
@@ -11,15 +12,14 @@ from webdriver_manager.chrome import ChromeDriverManager
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from dotenv import load_dotenv
-from bs4 import BeautifulSoup
-import google.generativeai as genai
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from selenium.common.exceptions import (
     TimeoutException,
     ElementClickInterceptedException,
+    WebDriverException,
 )
 from selenium.webdriver.common.action_chains import ActionChains
-from random import choice  # Import the choice function
 
 load_dotenv()
 
@@ -80,6 +80,54 @@ cv_info = (
 )
 
 
+# Phrases randomly prepended to generated comments to add some variability
+comment_openers = (
+    "Great point!",
+    "I couldn't agree more.",
+    "That's an interesting perspective.",
+    "Thanks for sharing this.",
+    "Very insightful.",
+)
+
+# Returns {id, text} for every rendered post on the page. Hidden placeholder posts
+# are skipped in the browser, since their buttons can never become clickable.
+# checkVisibility() also catches visibility:hidden; older browsers fall back to
+# checking for layout boxes.
+collect_posts_js = """
+return Array.from(document.querySelectorAll('div[data-id]'))
+    .filter((post) => post.checkVisibility
+        ? post.checkVisibility({visibilityProperty: true})
+        : post.getClientRects().length > 0)
+    .map((post) => ({id: post.getAttribute('data-id'), text: post.innerText.trim()}));
+"""
+
+# Markdown syntax stripped from generated text, compiled once at import
+heading_pattern = re.compile(r"(#+)(.*)")
+markdown_patterns = (
+    re.compile(r"(\*{1,2})(.*?)\1"),  # Bold and italics
+    re.compile(r"\[(.*?)\]\((.*?)\)"),  # Links
+    re.compile(r"`(.*?)`"),  # Inline code
+    re.compile(r"(\n\s*)- (.*)"),  # Unordered lists (with `-`)
+    re.compile(r"(\n\s*)\* (.*)"),  # Unordered lists (with `*`)
+    re.compile(r"(\n\s*)[0-9]+\. (.*)"),  # Ordered lists
+    heading_pattern,  # Headings
+    re.compile(r"(>+)(.*)"),  # Blockquotes
+    re.compile(r"(---|\*\*\*)"),  # Horizontal rules
+    re.compile(r"!\[(.*?)\]\((.*?)\)"),  # Images
+)
+
+
+@functools.lru_cache(maxsize=None)
+def gemini_model():
+    """Configures the Gemini client once and returns the shared model."""
+    # Imported on first use; the SDK is slow to import and isn't needed for
+    # driver setup and login
+    import google.generativeai as genai
+
+    genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+    return genai.GenerativeModel("gemini-pro")
+
+
 class LinkedInBot:
     """
     A class representing a bot for interacting with LinkedIn, capable of liking posts,
@@ -90,6 +138,8 @@ class LinkedInBot:
         self.driver = self.setup_driver()
         self.login()
         self.posts_data = []
+        self.seen_post_ids = set()
+        self.last_action_ts = 0.0
 
     def setup_driver(self):
         """Sets up the Chrome WebDriver with necessary options."""
@@ -114,6 +164,13 @@ class LinkedInBot:
         """Introduce a random delay to mimic human behavior."""
         time.sleep(random.uniform(min_delay, max_delay))
 
+    def pace_action(self, min_gap=3, max_gap=5):
+        """Keeps a random gap between actions, sleeping only for the part not already spent elsewhere."""
+        remaining = self.last_action_ts + random.uniform(min_gap, max_gap) - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+        self.last_action_ts = time.monotonic()
+
     def login(self):
         """Logs into LinkedIn using credentials from environment variables."""
         self.driver.get("https://www.linkedin.com/login")
@@ -148,18 +205,27 @@ class LinkedInBot:
     def refresh_page(self):
         logging.info("Refreshing the current page.")
         self.driver.refresh()
-        self.random_delay(2, 5)
+        # Wait for the feed to render its posts rather than sleeping a fixed interval
+        try:
+            WebDriverWait(self.driver, 5, poll_frequency=0.1).until(
+                EC.presence_of_element_located((By.CSS_SELECTOR, "div[data-id]"))
+            )
+        except TimeoutException:
+            logging.info("No posts rendered after refresh; continuing.")
 
     def fetch_and_store_content(self):
         logging.info("Fetching and storing content from LinkedIn posts.")
         try:
-            posts = self.driver.find_elements(By.CSS_SELECTOR, "div[data-id]")
+            # Collect every post's id and text in one script call rather than
+            # per-post attribute round-trips
+            posts = self.driver.execute_script(collect_posts_js)
+            # Skip posts already stored so repeated fetches don't queue them twice
             for post in posts:
-                post_id = post.get_attribute("data-id")
-                post_html = post.get_attribute("outerHTML")
-                self.posts_data.append({"id": post_id, "html": post_html})
-            logging.info(f"Content fetched for {len(self.posts_data)} posts.")
-        except Exception as e:
+                if post["id"] not in self.seen_post_ids:
+                    self.seen_post_ids.add(post["id"])
+                    self.posts_data.append(post)
+            logging.info("Content fetched for %d posts.", len(self.posts_data))
+        except WebDriverException:
             logging.error("Failed to fetch and store content.", exc_info=True)
 
     def remove_markdown(self, text):
@@ -173,36 +239,26 @@ class LinkedInBot:
             The text string with markdown syntax removed.
         """
 
-        patterns = [
-            r"(\*{1,2})(.*?)\1",  # Bold and italics
-            r"\[(.*?)\]\((.*?)\)",  # Links
-            r"`(.*?)`",  # Inline code
-            r"(\n\s*)- (.*)",  # Unordered lists (with `-`)
-            r"(\n\s*)\* (.*)",  # Unordered lists (with `*`)
-            r"(\n\s*)[0-9]+\. (.*)",  # Ordered lists
-            r"(#+)(.*)",  # Headings
-            r"(>+)(.*)",  # Blockquotes
-            r"(---|\*\*\*)",  # Horizontal rules
-            r"!\[(.*?)\]\((.*?)\)",  # Images
-        ]
-
         # Replace markdown elements with an empty string
-        for pattern in patterns:
-            text = re.sub(
-                pattern, r" ", text
-            )  # Extracts the inner content (group 2) if available
+        for pattern in markdown_patterns:
+            text = pattern.sub(" ", text)
 
         return text.strip()
 
     def comment_on_post(self, post, comment_text):
-        logging.info(f"Attempting to comment on post {post['id']}.")
+        logging.info("Attempting to comment on post %s.", post["id"])
         try:
-            comment_button = WebDriverWait(self.driver, 22).until(
+            # Resolve the post container once and scope the lookups below to it,
+            # instead of re-searching the whole document for the post each time
+            post_root = WebDriverWait(self.driver, 22, poll_frequency=0.1).until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, f"div[data-id='{post['id']}']")
+                )
+            )
+
+            comment_button = WebDriverWait(post_root, 22, poll_frequency=0.1).until(
                 EC.element_to_be_clickable(
-                    (
-                        By.XPATH,
-                        f"//div[@data-id='{post['id']}']//button[contains(@aria-label, 'Comment')]",
-                    )
+                    (By.CSS_SELECTOR, "button[aria-label*='Comment']")
                 )
             )
             ActionChains(self.driver).move_to_element(
@@ -211,10 +267,8 @@ class LinkedInBot:
             comment_button.click()
             self.random_delay()
 
-            comment_input = WebDriverWait(self.driver, 22).until(
-                EC.visibility_of_element_located(
-                    (By.XPATH, f"//div[@data-id='{post['id']}']//div[@role='textbox']")
-                )
+            comment_input = WebDriverWait(post_root, 22, poll_frequency=0.1).until(
+                EC.visibility_of_element_located((By.CSS_SELECTOR, "div[role='textbox']"))
             )
             self.driver.execute_script(
                 "arguments[0].innerText = arguments[1];",
@@ -223,61 +277,63 @@ class LinkedInBot:
             )
             self.random_delay()
 
-            post_comment_button = WebDriverWait(self.driver, 22).until(
+            post_comment_button = WebDriverWait(post_root, 22, poll_frequency=0.1).until(
                 EC.element_to_be_clickable(
                     (
                         By.XPATH,
-                        f"//div[@data-id='{post['id']}']//button[contains(@class, 'comments-comment-box__submit-button') and .//span[text()='Post']]",
+                        ".//button[contains(@class, 'comments-comment-box__submit-button') and .//span[text()='Post']]",
                     )
                 )
             )
             post_comment_button.click()
-            logging.info(f"Comment posted successfully on post {post['id']}.")
-        except Exception as e:
+            logging.info("Comment posted successfully on post %s.", post["id"])
+        except WebDriverException as e:
             logging.error(
-                f"Failed to comment on post {post['id']}: {str(e)}", exc_info=True
+                "Failed to comment on post %s: %s", post["id"], e, exc_info=True
             )
 
     def like_post(self, post):
-        logging.info(f"Attempting to like post {post['id']}.")
+        logging.info("Attempting to like post %s.", post["id"])
         try:
-            like_button = WebDriverWait(self.driver, 22).until(
+            like_button = WebDriverWait(self.driver, 22, poll_frequency=0.1).until(
                 EC.element_to_be_clickable(
                     (
-                        By.XPATH,
-                        f"//div[@data-id='{post['id']}']//button[contains(@aria-label, 'Like')]",
+                        By.CSS_SELECTOR,
+                        f"div[data-id='{post['id']}'] button[aria-label*='Like']",
                     )
                 )
             )
 
-            # Scroll to the "Like" button to ensure it's visible
-            self.driver.execute_script(
-                "arguments[0].scrollIntoView(true);", like_button
+            # Scroll to the "Like" button and read its pressed state in one round-trip
+            pressed = self.driver.execute_script(
+                "arguments[0].scrollIntoView(true);"
+                "return arguments[0].getAttribute('aria-pressed');",
+                like_button,
             )
 
-            # Click the button via JavaScript if interception is detected
-            if like_button.get_attribute("aria-pressed") == "false":
+            if pressed == "false":
+                # Pause to simulate user behavior and avoid rapid-fire actions
+                self.pace_action(3, 5)
+
+                # Click the button via JavaScript if interception is detected
                 try:
                     like_button.click()
                 except ElementClickInterceptedException:
                     self.driver.execute_script("arguments[0].click();", like_button)
 
-                logging.info(f"Post {post['id']} liked successfully!")
-                self.random_delay(
-                    3, 5
-                )  # Pause to simulate user behavior and avoid rapid-fire actions
+                logging.info("Post %s liked successfully!", post["id"])
         except TimeoutException:
             logging.error(
-                f"Failed to find or click the Like button for post {post['id']} within the timeout period."
+                "Failed to find or click the Like button for post %s within the timeout period.",
+                post["id"],
             )
-        except Exception as e:
-            logging.error(f"Failed to like post {post['id']}: {str(e)}", exc_info=True)
+        except WebDriverException as e:
+            logging.error("Failed to like post %s: %s", post["id"], e, exc_info=True)
 
     def generate_comment_based_on_content(self, post_text):
         logging.info("Generating comment based on content analysis.")
         try:
-            genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-            client = genai.GenerativeModel("gemini-pro")
+            client = gemini_model()
 
             messages = [
                 {
@@ -302,40 +358,63 @@ class LinkedInBot:
             return None
 
     def post_process_comment(self, comment):
-        # Add some variability to make the comment sound more natural
-        phrases_to_add = [
-            "Great point!",
-            "I couldn't agree more.",
-            "That's an interesting perspective.",
-            "Thanks for sharing this.",
-            "Very insightful.",
-        ]
-
-        # Randomly decide whether to add a phrase or not
-        if choice([True, False]):
-            comment = f"{choice(phrases_to_add)} {comment}"
+        # Randomly decide whether to add a phrase to make the comment sound more natural
+        if random.choice([True, False]):
+            comment = f"{random.choice(comment_openers)} {comment}"
 
         # Ensure the comment has a human touch
         comment = comment.replace("AI", "I")  # Simple example of personalization
 
         return comment
 
+    def prepare_comment(self, post):
+        """
+        Generates a comment for a post from its collected text.
+
+        Runs off the driver thread, so it must not touch self.driver.
+
+        Args:
+            post: A stored post dict with "id" and "text" keys.
+
+        Returns:
+            The cleaned comment text, or None if the post is too short or generation failed.
+        """
+        post_text = post["text"]
+        if len(post_text) <= 220:
+            return None
+
+        ai_content = self.generate_comment_based_on_content(post_text)
+        if not ai_content:
+            return None
+        return self.remove_markdown(ai_content.strip('"'))
+
     def analyze_and_interact(self):
         """Analyzes the fetched content and decides on interactions based on its sentiment and relevance."""
-        for post in self.posts_data:
-            post_text = BeautifulSoup(post["html"], "html.parser").text.strip()
-            if len(post_text) > 220:
-                ai_content = self.generate_comment_based_on_content(post_text).strip(
-                    '"'
-                )
-                comment_text = self.remove_markdown(ai_content)
-                print(f"\n\n Comment Text: {comment_text} \n\n")
+        # Comment generation is network-bound, so prepare the next post's comment in a
+        # background thread while the driver likes the current one. Only one post is
+        # prepared ahead; driver actions themselves stay serial on this thread.
+        executor = ThreadPoolExecutor(max_workers=1)
+        try:
+            pending = None
+            if self.posts_data:
+                pending = executor.submit(self.prepare_comment, self.posts_data[0])
+
+            for index, post in enumerate(self.posts_data):
+                comment_text = pending.result()
+                if index + 1 < len(self.posts_data):
+                    pending = executor.submit(
+                        self.prepare_comment, self.posts_data[index + 1]
+                    )
+
                 if comment_text:
+                    print(f"\n\n Comment Text: {comment_text} \n\n")
                     #     self.comment_on_post(post, comment_text)
                     # else:
                     #     print("Failed to generate a comment.")
-                    pass
-            self.like_post(post)
+                self.like_post(post)
+        finally:
+            # Don't hold up an interrupted run on the in-flight generation
+            executor.shutdown(wait=False, cancel_futures=True)
 
 
 if __name__ == "__main__":